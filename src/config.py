@@ -13,6 +13,14 @@ class Settings(BaseSettings):
     evolution_api_url: str
     evolution_api_key: str
     evolution_instance_name: str
+    evolution_instance_names: str = ""  # comma-separated pool (optional)
+    evolution_rate_limit_per_minute: int = 20
+    evolution_failure_threshold: int = 3
+    evolution_unhealthy_cooldown: int = 60  # seconds
+    
+    # Human agent event feed
+    event_history_size: int = 1000
+    event_buffer_size: int = 100  # per subscriber
     
     # Application
     app_host: str = "0.0.0.0"
@@ -23,6 +31,16 @@ class Settings(BaseSettings):
     use_ngrok: bool = False
     ngrok_auth_token: str | None = None
     
+    @property
+    def evolution_instances(self) -> list[str]:
+        """Instance names in the pool (default instance first)"""
+        names = [self.evolution_instance_name]
+        for name in self.evolution_instance_names.split(","):
+            name = name.strip()
+            if name and name not in names:
+                names.append(name)
+        return names
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -1,12 +1,15 @@
-from fastapi import FastAPI, Request, HTTPException
+from fastapi import FastAPI, Request, HTTPException, Header
+from fastapi.responses import StreamingResponse
 from contextlib import asynccontextmanager
+import asyncio
 import uvicorn
 from loguru import logger
 
 from src.config import settings
 from src.agents.openai_agent import agent
-from src.services.evolution_client import evolution_client
+from src.services.instance_pool import instance_pool
 from src.services.session_manager import session_manager
+from src.services.event_broker import event_broker
 
 
 # Configurar logger
@@ -66,6 +69,12 @@ async def webhook_handler(request: Request):
         # Extract message info
         event = data.get("event")
         
+        # Route by receiving instance (default instance if not informed)
+        instance = data.get("instance") or instance_pool.default_instance
+        if not instance_pool.has_instance(instance):
+            logger.warning(f"⚠️ Webhook from unknown instance '{instance}'")
+            return {"status": "ignored", "reason": "unknown_instance", "instance": instance}
+        
         if event == "messages.upsert":
             # New message received
             message_data = data.get("data", {})
@@ -98,13 +107,17 @@ async def webhook_handler(request: Request):
             if not session:
                 # Create new session (openai-agents manages history automatically)
                 session_id = phone  # Use phone as session_id for simplicity
-                session = session_manager.create_session(phone, session_id)
+                session = session_manager.create_session(phone, session_id, instance)
+            elif not session.get("instance"):
+                # Bind legacy sessions to the instance they are writing to
+                session_manager.update_session(phone, instance=instance)
             
             session_id = session["session_id"]
             
             # Check if bot should handle
             if not session_manager.is_bot_handler(phone):
                 logger.info(f"👤 Message forwarded to human handler for {phone[:8]}...")
+                event_broker.publish("message", phone, text=text, instance=instance)
                 return {"status": "forwarded_to_human", "phone": phone}
             
             # Process with OpenAI Agent
@@ -118,9 +131,10 @@ async def webhook_handler(request: Request):
                 if needs_transfer:
                     session_manager.set_handler(phone, "human")
                     logger.warning(f"⚠️ Transfer to human requested for {phone[:8]}...")
+                    event_broker.publish("handoff", phone, handler="human", reason="agent_request", last_message=text)
                 
                 # Send response via Evolution
-                await evolution_client.send_text_message(phone, response_text)
+                await instance_pool.send_text_message(phone, response_text, session_manager.get_instance(phone))
                 
                 logger.info(f"✅ Response sent to {phone[:8]}...")
                 
@@ -132,10 +146,13 @@ async def webhook_handler(request: Request):
             
             except Exception as e:
                 logger.error(f"❌ Error processing message: {e}")
+                # Hand off first so the customer isn't dropped if the send fails too
+                session_manager.set_handler(phone, "human")
+                event_broker.publish("handoff", phone, handler="human", reason="agent_error", last_message=text)
+                
                 # Send error message to user
                 error_msg = "Desculpe, estou com problemas técnicos no momento. Um atendente vai te ajudar em breve."
-                await evolution_client.send_text_message(phone, error_msg)
-                session_manager.set_handler(phone, "human")
+                await instance_pool.send_text_message(phone, error_msg, session_manager.get_instance(phone))
                 
                 return {
                     "status": "error",
@@ -158,6 +175,17 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/instances")
+async def list_instances():
+    """List Evolution instances with health and rate state"""
+    instances = instance_pool.get_states()
+    return {
+        "total": len(instances),
+        "healthy": sum(1 for i in instances if i["healthy"]),
+        "instances": instances
+    }
+
+
 @app.get("/sessions")
 async def list_sessions():
     """List all active sessions"""
@@ -168,6 +196,45 @@ async def list_sessions():
     }
 
 
+@app.get("/events")
+async def event_stream(
+    request: Request,
+    last_event_id: str | None = None,
+    last_event_id_header: str | None = Header(None, alias="Last-Event-ID")
+):
+    """
+    Server-Sent Events feed for human agents (handoffs and customer messages)
+    
+    Reconnecting clients resume from the Last-Event-ID header (or the
+    last_event_id query param). A "reset" event means the feed could not be
+    resumed and /sessions should be reloaded.
+    """
+    last_event_id = last_event_id or last_event_id_header
+    
+    async def stream():
+        # Subscribe inside the generator so unsubscribe always runs with it
+        subscriber = event_broker.subscribe(last_event_id)
+        try:
+            while not await request.is_disconnected():
+                if subscriber.overflowed and subscriber.queue.empty():
+                    logger.warning("⚠️ Event subscriber buffer overflowed, closing stream")
+                    break
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), timeout=15.0)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield event_broker.format_sse(event)
+        finally:
+            event_broker.unsubscribe(subscriber)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.post("/sessions/{phone}/transfer")
 async def transfer_to_human(phone: str):
     """Transfer session to human handler"""
@@ -176,6 +243,7 @@ async def transfer_to_human(phone: str):
         raise HTTPException(status_code=404, detail="Session not found")
     
     session_manager.set_handler(phone, "human")
+    event_broker.publish("handoff", phone, handler="human", reason="manual")
     return {"status": "transferred", "phone": phone}
 
 
@@ -187,6 +255,7 @@ async def resume_bot_handler(phone: str):
         raise HTTPException(status_code=404, detail="Session not found")
     
     session_manager.set_handler(phone, "bot")
+    event_broker.publish("handoff", phone, handler="bot", reason="manual")
     return {"status": "resumed", "phone": phone}
 
 
@@ -13,6 +13,7 @@ class SessionInfo(BaseModel):
     """Schema for session information"""
     session_id: str
     handler: str
+    instance: Optional[str] = None
     created_at: str
     last_interaction: str
     message_count: int
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Optional, Set, Tuple
+from loguru import logger
+from src.config import settings
+
+
+class Subscriber:
+    """Event feed subscriber with a bounded buffer"""
+    
+    def __init__(self, buffer_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        self.overflowed = False
+    
+    def push(self, event: dict):
+        """Queue event, flagging overflow when the buffer is full"""
+        if self.overflowed:
+            # Stop at the gap: the client resumes from history after reconnecting
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow consumer: drop it so the client reconnects and resumes via Last-Event-ID
+            self.overflowed = True
+
+
+class EventBroker:
+    """Publish/subscribe feed of human-handoff events"""
+    
+    def __init__(self, history_size: int = 1000, buffer_size: int = 100):
+        self.buffer_size = buffer_size
+        self.history: deque = deque(maxlen=history_size)
+        self.subscribers: Set[Subscriber] = set()
+        # IDs are "<boot_id>-<seq>" so clients can tell when the process restarted
+        self.boot_id = uuid.uuid4().hex[:8]
+        self._last_seq = 0
+    
+    def _event_id(self, seq: int) -> str:
+        """Build event ID for this process"""
+        return f"{self.boot_id}-{seq}"
+    
+    @staticmethod
+    def parse_event_id(event_id: str) -> Optional[Tuple[str, int]]:
+        """Split event ID into (boot_id, seq), or None if malformed"""
+        boot_id, _, seq = event_id.rpartition("-")
+        if not boot_id or not seq.isdigit():
+            return None
+        return boot_id, int(seq)
+    
+    def publish(self, event_type: str, phone: str, **data) -> dict:
+        """
+        Publish event to all subscribers
+        
+        Args:
+            event_type: Event name (e.g. "handoff", "message")
+            phone: Phone number the event refers to
+            **data: Extra event fields
+            
+        Returns:
+            dict: Published event
+        """
+        self._last_seq += 1
+        event = {
+            "id": self._event_id(self._last_seq),
+            "seq": self._last_seq,
+            "event": event_type,
+            "data": {
+                "phone": phone,
+                "timestamp": datetime.now().isoformat(),
+                **data
+            }
+        }
+        self.history.append(event)
+        
+        for subscriber in self.subscribers:
+            subscriber.push(event)
+        
+        logger.debug(f"📡 Event '{event_type}' #{event['id']} published for {phone[:8]}...")
+        return event
+    
+    def _missed_events(self, last_event_id: str) -> Optional[list]:
+        """Events after last_event_id, or None if the client can't resume cleanly"""
+        parsed = self.parse_event_id(last_event_id)
+        if not parsed:
+            return None
+        
+        boot_id, seq = parsed
+        if boot_id != self.boot_id or seq > self._last_seq:
+            return None
+        
+        oldest_seq = self.history[0]["seq"] if self.history else self._last_seq + 1
+        if oldest_seq > seq + 1:
+            # Part of the gap already expired from history
+            return None
+        
+        return [e for e in self.history if e["seq"] > seq]
+    
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscriber:
+        """
+        Register a subscriber, replaying events after last_event_id
+        
+        If the client can't resume (process restarted, events expired from
+        history or malformed ID), a single "reset" event is sent instead so it
+        reloads /sessions.
+        
+        Args:
+            last_event_id: Last event ID received by the client (on reconnect)
+            
+        Returns:
+            Subscriber: New subscriber
+        """
+        subscriber = Subscriber(self.buffer_size)
+        
+        if last_event_id is not None:
+            missed = self._missed_events(last_event_id)
+            if missed is None:
+                logger.warning(f"⚠️ Can't resume feed from event {last_event_id}, sending reset")
+                subscriber.push({
+                    "id": self._event_id(self._last_seq),
+                    "event": "reset",
+                    "data": {"timestamp": datetime.now().isoformat()}
+                })
+            else:
+                for event in missed:
+                    subscriber.push(event)
+        
+        self.subscribers.add(subscriber)
+        logger.info(f"🔌 Event subscriber connected ({len(self.subscribers)} active)")
+        return subscriber
+    
+    def unsubscribe(self, subscriber: Subscriber):
+        """Remove a subscriber"""
+        self.subscribers.discard(subscriber)
+        logger.info(f"🔌 Event subscriber disconnected ({len(self.subscribers)} active)")
+    
+    @staticmethod
+    def format_sse(event: dict) -> str:
+        """Format event as Server-Sent Events message"""
+        return f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+# Singleton instance
+event_broker = EventBroker(
+    history_size=settings.event_history_size,
+    buffer_size=settings.event_buffer_size
+)
@@ -1,19 +1,78 @@
+import time
+from collections import deque
 import httpx
 from loguru import logger
 from src.config import settings
 
 
+def is_instance_failure(error: Exception) -> bool:
+    """Check if error counts against instance health (5xx/429 or transport error)"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500 or error.response.status_code == 429
+    return isinstance(error, httpx.TransportError)
+
+
+def is_safe_to_resend(error: Exception) -> bool:
+    """Check if the request surely never reached Evolution (safe to send via another instance)"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in (429, 503)
+    return isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout))
+
+
 class EvolutionClient:
     """Client for Evolution API communication"""
     
-    def __init__(self):
+    def __init__(self, instance_name: str = None):
         self.base_url = settings.evolution_api_url
         self.api_key = settings.evolution_api_key
-        self.instance_name = settings.evolution_instance_name
+        self.instance_name = instance_name or settings.evolution_instance_name
         self.headers = {
             "apikey": self.api_key,
             "Content-Type": "application/json"
         }
+        
+        # Health and rate state
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+        self._sent_at: deque = deque()
+    
+    def is_healthy(self) -> bool:
+        """Check if instance is accepting messages (not in failure cooldown)"""
+        return time.monotonic() >= self.unhealthy_until
+    
+    def sent_last_minute(self) -> int:
+        """Number of messages sent in the last 60 seconds"""
+        cutoff = time.monotonic() - 60
+        while self._sent_at and self._sent_at[0] < cutoff:
+            self._sent_at.popleft()
+        return len(self._sent_at)
+    
+    def has_capacity(self) -> bool:
+        """Check if instance is below its per-minute rate limit"""
+        return self.sent_last_minute() < settings.evolution_rate_limit_per_minute
+    
+    def _record_success(self):
+        """Register a successful send"""
+        self._sent_at.append(time.monotonic())
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+    
+    def _record_failure(self):
+        """Register a failed send, marking instance unhealthy after too many"""
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= settings.evolution_failure_threshold:
+            self.unhealthy_until = time.monotonic() + settings.evolution_unhealthy_cooldown
+            logger.warning(f"🚫 Instance '{self.instance_name}' marked unhealthy for {settings.evolution_unhealthy_cooldown}s")
+    
+    def get_state(self) -> dict:
+        """Get health and rate state"""
+        return {
+            "instance": self.instance_name,
+            "healthy": self.is_healthy(),
+            "consecutive_failures": self.consecutive_failures,
+            "sent_last_minute": self.sent_last_minute(),
+            "rate_limit_per_minute": settings.evolution_rate_limit_per_minute
+        }
     
     async def send_text_message(self, phone: str, message: str) -> dict:
         """
@@ -49,15 +108,22 @@ class EvolutionClient:
                 )
                 
                 response.raise_for_status()
+                self._record_success()
                 result = response.json()
                 
                 logger.info(f"✉️ Message sent to {phone[:8]}... - Status: {response.status_code}")
                 return result
         
         except httpx.HTTPStatusError as e:
+            # Client errors (e.g. invalid number) don't count against instance health
+            if is_instance_failure(e):
+                self._record_failure()
             logger.error(f"❌ HTTP error sending message: {e.response.status_code} - {e.response.text}")
             raise
         except Exception as e:
+            # Timeouts/network errors count; a bad body after a 2xx doesn't
+            if is_instance_failure(e):
+                self._record_failure()
             logger.error(f"❌ Error sending message: {e}")
             raise
     
@@ -99,12 +165,22 @@ class EvolutionClient:
                 )
                 
                 response.raise_for_status()
+                self._record_success()
                 result = response.json()
                 
                 logger.info(f"📎 File sent to {phone[:8]}...")
                 return result
         
+        except httpx.HTTPStatusError as e:
+            # Client errors (e.g. invalid URL) don't count against instance health
+            if is_instance_failure(e):
+                self._record_failure()
+            logger.error(f"❌ HTTP error sending file: {e.response.status_code} - {e.response.text}")
+            raise
         except Exception as e:
+            # Timeouts/network errors count; a bad body after a 2xx doesn't
+            if is_instance_failure(e):
+                self._record_failure()
             logger.error(f"❌ Error sending file: {e}")
             raise
     
@@ -165,5 +241,5 @@ class EvolutionClient:
             raise
 
 
-# Singleton instance
+# Singleton instance (default instance)
 evolution_client = EvolutionClient()
\ No newline at end of file
@@ -0,0 +1,105 @@
+from typing import Dict, Optional
+from loguru import logger
+from src.config import settings
+from src.services.evolution_client import EvolutionClient, evolution_client, is_safe_to_resend
+
+
+class InstancePool:
+    """Pool of Evolution instances with sticky, load-balanced sending"""
+    
+    def __init__(self, instance_names: list[str]):
+        self.default_instance = instance_names[0]
+        # Reuse the default singleton so its health/rate state is shared
+        self.clients: Dict[str, EvolutionClient] = {
+            name: evolution_client if name == evolution_client.instance_name else EvolutionClient(name)
+            for name in instance_names
+        }
+        logger.info(f"📱 Evolution pool initialized with {len(self.clients)} instance(s)")
+    
+    def has_instance(self, instance_name: str) -> bool:
+        """Check if instance belongs to the pool"""
+        return instance_name in self.clients
+    
+    def select_client(self, preferred: Optional[str] = None) -> EvolutionClient:
+        """
+        Select client for outbound message
+        
+        Keeps the preferred (sticky) instance while it is healthy and below its
+        rate limit, otherwise falls back to the least loaded healthy instance.
+        
+        Args:
+            preferred: Instance the customer is bound to
+            
+        Returns:
+            EvolutionClient: Client to send through
+        """
+        client = self.clients.get(preferred)
+        if client and client.is_healthy() and client.has_capacity():
+            return client
+        
+        healthy = [c for c in self.clients.values() if c.is_healthy()]
+        if not healthy:
+            # Nothing healthy: keep trying the sticky/default instance
+            return client or self.clients[self.default_instance]
+        
+        selected = min(healthy, key=lambda c: c.sent_last_minute())
+        if preferred and selected.instance_name != preferred:
+            logger.warning(f"🔀 Instance '{preferred}' unavailable, sending via '{selected.instance_name}'")
+        return selected
+    
+    def _fallback_client(self, failed: EvolutionClient, error: Exception) -> Optional[EvolutionClient]:
+        """Pick another healthy instance to retry a send that never reached Evolution"""
+        if not is_safe_to_resend(error):
+            return None
+        
+        healthy = [c for c in self.clients.values() if c is not failed and c.is_healthy()]
+        if not healthy:
+            return None
+        
+        fallback = min(healthy, key=lambda c: c.sent_last_minute())
+        logger.warning(f"🔁 Send via '{failed.instance_name}' failed, retrying via '{fallback.instance_name}'")
+        return fallback
+    
+    async def send_text_message(self, phone: str, message: str, instance_name: Optional[str] = None) -> dict:
+        """
+        Send text message through the pool
+        
+        Sends that surely never reached Evolution (connection errors, 429/503)
+        are retried once through another healthy instance. Timeouts are not
+        resent, since the message may already have been delivered.
+        
+        Args:
+            phone: Phone number (format: 5562999999999)
+            message: Text message to send
+            instance_name: Sticky instance for this customer
+            
+        Returns:
+            dict: Response from Evolution API
+        """
+        client = self.select_client(instance_name)
+        try:
+            return await client.send_text_message(phone, message)
+        except Exception as e:
+            fallback = self._fallback_client(client, e)
+            if not fallback:
+                raise
+            return await fallback.send_text_message(phone, message)
+    
+    async def send_file(self, phone: str, file_url: str, caption: str = None, instance_name: Optional[str] = None) -> dict:
+        """Send file/media through the pool (retried once like text messages)"""
+        client = self.select_client(instance_name)
+        try:
+            return await client.send_file(phone, file_url, caption)
+        except Exception as e:
+            fallback = self._fallback_client(client, e)
+            if not fallback:
+                raise
+            return await fallback.send_file(phone, file_url, caption)
+    
+    def get_states(self) -> list[dict]:
+        """Get health and rate state of every instance"""
+        return [client.get_state() for client in self.clients.values()]
+
+
+# Singleton instance
+instance_pool = InstancePool(settings.evolution_instances)
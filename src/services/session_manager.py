@@ -41,11 +41,12 @@ class SessionManager:
         """Get session for a phone number"""
         return self.sessions.get(phone)
     
-    def create_session(self, phone: str, session_id: str) -> dict:
-        """Create new session for a phone number"""
+    def create_session(self, phone: str, session_id: str, instance: Optional[str] = None) -> dict:
+        """Create new session for a phone number, bound to the instance it came from"""
         session = {
             "session_id": session_id,
             "handler": "bot",  # or "human"
+            "instance": instance,
             "created_at": datetime.now().isoformat(),
             "last_interaction": datetime.now().isoformat(),
             "message_count": 0
@@ -81,6 +82,11 @@ class SessionManager:
         session = self.get_session(phone)
         return session and session.get("handler") == "bot"
     
+    def get_instance(self, phone: str) -> Optional[str]:
+        """Get the instance a session is bound to"""
+        session = self.get_session(phone)
+        return session.get("instance") if session else None
+    
     def delete_session(self, phone: str):
         """Delete session for a phone number"""
         if phone in self.sessions:
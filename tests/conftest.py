@@ -0,0 +1,7 @@
+import os
+
+# Required settings so src.config can be imported without a .env file
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("EVOLUTION_API_URL", "http://evolution.test")
+os.environ.setdefault("EVOLUTION_API_KEY", "test-key")
+os.environ.setdefault("EVOLUTION_INSTANCE_NAME", "default")
@@ -0,0 +1,117 @@
+import asyncio
+
+from src.services.event_broker import EventBroker
+
+
+def drain(subscriber) -> list[str]:
+    """Collect queued event IDs without blocking"""
+    ids = []
+    while not subscriber.queue.empty():
+        ids.append(subscriber.queue.get_nowait()["id"])
+    return ids
+
+
+def drain_events(subscriber) -> list[str]:
+    """Collect queued event names without blocking"""
+    names = []
+    while not subscriber.queue.empty():
+        names.append(subscriber.queue.get_nowait()["event"])
+    return names
+
+
+def ids(broker: EventBroker, *seqs: int) -> list[str]:
+    return [f"{broker.boot_id}-{seq}" for seq in seqs]
+
+
+def test_publish_reaches_subscribers():
+    broker = EventBroker()
+    subscriber = broker.subscribe()
+    event = broker.publish("handoff", "5562999999999", handler="human", reason="manual")
+    
+    assert event["id"] == f"{broker.boot_id}-1"
+    assert event["data"]["phone"] == "5562999999999"
+    assert event["data"]["handler"] == "human"
+    assert drain(subscriber) == ids(broker, 1)
+
+
+def test_parse_event_id():
+    assert EventBroker.parse_event_id("a1b2c3d4-42") == ("a1b2c3d4", 42)
+    assert EventBroker.parse_event_id("42") is None
+    assert EventBroker.parse_event_id("a1b2c3d4-x") is None
+
+
+def test_subscribe_replays_events_after_last_id():
+    broker = EventBroker()
+    for i in range(5):
+        broker.publish("message", "5562999999999", text=str(i))
+    
+    assert drain(broker.subscribe(f"{broker.boot_id}-3")) == ids(broker, 4, 5)
+    assert drain(broker.subscribe(f"{broker.boot_id}-5")) == []
+    assert drain(broker.subscribe()) == []
+
+
+def test_subscribe_from_previous_process_sends_reset():
+    previous = EventBroker()
+    for i in range(50):
+        previous.publish("message", "5562999999999", text=str(i))
+    
+    # Restarted process already published more events than the client saw
+    broker = EventBroker()
+    for i in range(60):
+        broker.publish("message", "5562999999999", text=str(i))
+    
+    subscriber = broker.subscribe(f"{previous.boot_id}-50")
+    event = subscriber.queue.get_nowait()
+    assert event["event"] == "reset"
+    assert event["id"] == f"{broker.boot_id}-60"
+    assert subscriber.queue.empty()
+
+
+def test_subscribe_with_expired_history_sends_reset():
+    broker = EventBroker(history_size=3)
+    for i in range(5):
+        broker.publish("message", "5562999999999", text=str(i))
+    
+    # Event 2 expired: resuming after 1 would leave a gap
+    assert drain_events(broker.subscribe(f"{broker.boot_id}-1")) == ["reset"]
+    # Event 3 is the oldest retained: resuming after 2 is still complete
+    assert drain(broker.subscribe(f"{broker.boot_id}-2")) == ids(broker, 3, 4, 5)
+
+
+def test_subscribe_with_malformed_id_sends_reset():
+    broker = EventBroker()
+    broker.publish("message", "5562999999999", text="oi")
+    
+    assert drain_events(broker.subscribe("not-an-id")) == ["reset"]
+
+
+def test_unsubscribe_stops_delivery():
+    broker = EventBroker()
+    subscriber = broker.subscribe()
+    broker.unsubscribe(subscriber)
+    broker.publish("message", "5562999999999", text="oi")
+    
+    assert drain(subscriber) == []
+
+
+def test_overflow_then_resume_has_no_gap():
+    async def scenario():
+        broker = EventBroker(buffer_size=3)
+        subscriber = broker.subscribe()
+        
+        for i in range(4):
+            broker.publish("message", "5562999999999", text=str(i))
+        assert subscriber.overflowed
+        
+        # Consumer frees a slot, but events after the gap are not queued
+        received = [(await subscriber.queue.get())["id"]]
+        broker.publish("message", "5562999999999", text="4")
+        received += drain(subscriber)
+        assert received == ids(broker, 1, 2, 3)
+        
+        # Reconnect with the last received ID replays the rest
+        received += drain(broker.subscribe(received[-1]))
+        return broker, received
+    
+    broker, received = asyncio.run(scenario())
+    assert received == ids(broker, 1, 2, 3, 4, 5)
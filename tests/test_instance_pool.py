@@ -0,0 +1,165 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from src.config import settings
+from src.services.evolution_client import EvolutionClient
+from src.services.instance_pool import InstancePool
+
+
+@pytest.fixture
+def evolution_requests(monkeypatch):
+    """Route Evolution calls through a mock transport, recording request paths"""
+    paths = []
+    handlers = {}
+    real_client = httpx.AsyncClient
+    
+    def handle(request):
+        paths.append(request.url.path)
+        return handlers["respond"](request)
+    
+    monkeypatch.setattr(
+        httpx, "AsyncClient",
+        lambda **kwargs: real_client(transport=httpx.MockTransport(handle), **kwargs)
+    )
+    return paths, handlers
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(settings, "evolution_rate_limit_per_minute", 2)
+    monkeypatch.setattr(settings, "evolution_failure_threshold", 3)
+    monkeypatch.setattr(settings, "evolution_unhealthy_cooldown", 60)
+    return InstancePool(["a", "b", "c"])
+
+
+def fill(client: EvolutionClient, count: int):
+    """Simulate messages sent in the last minute"""
+    for _ in range(count):
+        client._record_success()
+
+
+def test_select_client_keeps_sticky_instance(pool):
+    fill(pool.clients["b"], 1)
+    assert pool.select_client("b").instance_name == "b"
+
+
+def test_select_client_falls_back_when_sticky_at_capacity(pool):
+    fill(pool.clients["a"], 2)
+    fill(pool.clients["b"], 2)
+    fill(pool.clients["c"], 1)
+    assert pool.select_client("a").instance_name == "c"
+
+
+def test_select_client_skips_unhealthy_sticky(pool):
+    pool.clients["a"].unhealthy_until = time.monotonic() + 60
+    fill(pool.clients["b"], 1)
+    assert pool.select_client("a").instance_name == "c"
+
+
+def test_select_client_without_preference_picks_least_loaded(pool):
+    fill(pool.clients["a"], 1)
+    fill(pool.clients["c"], 1)
+    assert pool.select_client().instance_name == "b"
+
+
+def test_select_client_all_unhealthy_keeps_sticky(pool):
+    for client in pool.clients.values():
+        client.unhealthy_until = time.monotonic() + 60
+    assert pool.select_client("b").instance_name == "b"
+    assert pool.select_client().instance_name == "a"
+
+
+def test_record_failure_threshold_and_cooldown(pool):
+    client = pool.clients["a"]
+    client._record_failure()
+    client._record_failure()
+    assert client.is_healthy()
+    
+    client._record_failure()
+    assert not client.is_healthy()
+    assert client.unhealthy_until == pytest.approx(time.monotonic() + 60, abs=1)
+    
+    # Cooldown expired: instance accepts messages again
+    client.unhealthy_until = time.monotonic() - 1
+    assert client.is_healthy()
+    
+    client._record_success()
+    assert client.consecutive_failures == 0
+
+
+def test_send_retries_on_other_instance_after_instance_failure(pool):
+    calls = []
+    
+    async def failing_send(phone, message):
+        calls.append("a")
+        raise httpx.ConnectError("connection refused")
+    
+    async def working_send(phone, message):
+        calls.append("b")
+        return {"status": "sent"}
+    
+    pool.clients["a"].send_text_message = failing_send
+    pool.clients["b"].send_text_message = working_send
+    fill(pool.clients["c"], 1)
+    
+    result = asyncio.run(pool.send_text_message("5562999999999", "oi", "a"))
+    assert result == {"status": "sent"}
+    assert calls == ["a", "b"]
+
+
+def test_send_does_not_retry_client_errors(pool):
+    request = httpx.Request("POST", "http://evolution.test")
+    response = httpx.Response(400, request=request)
+    
+    async def bad_request(phone, message):
+        raise httpx.HTTPStatusError("bad request", request=request, response=response)
+    
+    pool.clients["a"].send_text_message = bad_request
+    
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(pool.send_text_message("5562999999999", "oi", "a"))
+
+
+def test_send_does_not_resend_after_timeout(pool, evolution_requests):
+    paths, handlers = evolution_requests
+    
+    def timeout(request):
+        raise httpx.ReadTimeout("read timeout", request=request)
+    
+    handlers["respond"] = timeout
+    
+    with pytest.raises(httpx.ReadTimeout):
+        asyncio.run(pool.send_text_message("5562999999999", "oi", "a"))
+    
+    # Message may have been delivered: no resend, but it counts against health
+    assert paths == ["/message/sendText/a"]
+    assert pool.clients["a"].consecutive_failures == 1
+    assert pool.clients["b"].consecutive_failures == 0
+
+
+def test_send_accepted_with_invalid_body_is_not_a_failure(pool, evolution_requests):
+    paths, handlers = evolution_requests
+    handlers["respond"] = lambda request: httpx.Response(200, content=b"")
+    
+    with pytest.raises(json.JSONDecodeError):
+        asyncio.run(pool.send_text_message("5562999999999", "oi", "a"))
+    
+    assert paths == ["/message/sendText/a"]
+    assert all(c.consecutive_failures == 0 for c in pool.clients.values())
+    assert pool.clients["a"].sent_last_minute() == 1
+
+
+def test_send_resends_when_instance_unavailable(pool, evolution_requests):
+    paths, handlers = evolution_requests
+    fill(pool.clients["c"], 1)
+    handlers["respond"] = lambda request: httpx.Response(
+        503 if request.url.path.endswith("/a") else 200, json={"status": "sent"}
+    )
+    
+    result = asyncio.run(pool.send_text_message("5562999999999", "oi", "a"))
+    assert result == {"status": "sent"}
+    assert paths == ["/message/sendText/a", "/message/sendText/b"]